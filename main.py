@@ -1,18 +1,27 @@
 import asyncio
+import functools
+import importlib.util
+import inspect
 from contextlib import asynccontextmanager
 from collections.abc import AsyncIterator
-from typing import Any, Dict, List
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import httpx
 from hyperliquid.info import Info
 from hyperliquid.utils import constants
+from hyperliquid.utils.error import ClientError, ServerError
 from mcp.server.fastmcp import FastMCP, Context, Image
 from mcp.server.fastmcp.prompts import base
 from PIL import Image as PILImage
-import json
-from datetime import datetime
+import orjson
+import simdjson
+from datetime import datetime, timezone
 import iso8601
 import logging
+import os
+import platform
 import sys
 import time
+from starlette.middleware.gzip import GZipMiddleware
 
 # Configure detailed logging
 logging.basicConfig(
@@ -22,38 +31,365 @@ logging.basicConfig(
         logging.StreamHandler(sys.stdout)
     ]
 )
+# The background cache refreshers query the API every second; at DEBUG the HTTP client
+# would log a dozen lines per query even when the server is otherwise idle
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logging.getLogger("httpcore").setLevel(logging.WARNING)
 
 logger = logging.getLogger("hyperliquid-mcp")
 
-info = Info(constants.MAINNET_API_URL, skip_ws=True)  # Initialize Info for mainnet
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """Serialize an SDK response to a JSON string using orjson."""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None).decode()
+
+
+def as_json(result: Any) -> str:
+    """Serialize result, passing through a str that already holds JSON (e.g. a raw API response)."""
+    return result if isinstance(result, str) else dumps(result)
+
+
+_JSON_ESCAPES = str.maketrans({
+    **{chr(code): f"\\u{code:04x}" for code in range(0x20)},
+    '"': '\\"', "\\": "\\\\", "\b": "\\b", "\f": "\\f", "\n": "\\n", "\r": "\\r", "\t": "\\t",
+})
+
+
+def json_escape(text: str) -> str:
+    """Escape text for embedding inside a JSON string literal."""
+    return text.translate(_JSON_ESCAPES)
+
+
+def text_result(fn: Callable) -> Callable:
+    """
+    Hide fn's return annotation from FastMCP, so that its str result is sent only as text.
+
+    FastMCP derives an output schema from the return annotation and then repeats the
+    whole payload as structured content next to the text block, sending every
+    response twice. Tool payloads are already JSON text, so expose no return annotation.
+    """
+    fn.__signature__ = inspect.signature(fn).replace(return_annotation=inspect.Signature.empty)
+    return fn
+
+
+def tool_json(error_message: str) -> Callable:
+    """
+    Adapt a handler returning SDK data into a tool returning a JSON string.
+
+    The handler may also return an already-serialized str (e.g. from info_post_raw
+    or cached_dumps), which is passed through untouched. Any exception is reported as
+    {"error": "<error_message>: <exception>"}, formatted from a template prepared
+    once per tool so that failures cost a single string escape.
+    """
+    error_prefix = '{"error":"' + json_escape(error_message) + ": "
+
+    def decorator(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[str]]:
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs) -> str:
+            try:
+                return as_json(await fn(*args, **kwargs))
+            except Exception as e:
+                return error_prefix + json_escape(str(e)) + '"}'
+
+        return text_result(wrapper)  # Signature follows fn via functools.wraps
+    return decorator
+
+
+# Shared keep-alive HTTP/2 client for hot /info queries, so repeated calls reuse one
+# TLS connection instead of going through the SDK's blocking requests session.
+http_client = httpx.AsyncClient(
+    base_url=constants.MAINNET_API_URL,
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+    timeout=10.0,
+    headers={"Content-Type": "application/json"},
+)
+
+
+# Reused across documents to avoid reallocating parser buffers. simdjson is not
+# thread-safe, so it is only used from the event loop thread.
+_json_parser = simdjson.Parser()
+
+
+def select_json(raw: bytes, select: Callable[[Any], Any]) -> Any:
+    """
+    Parse raw JSON lazily and return select(document).
+
+    Only the parts of the document that select touches are converted to Python
+    objects, which is much cheaper than decoding everything when a tool needs a
+    small slice of a large payload. select must return plain Python values, since
+    the parser is reused for the next document.
+    """
+    global _json_parser
+    try:
+        document = _json_parser.parse(raw)
+    except RuntimeError:
+        # A proxy into the previous document is still alive (e.g. held by a traceback)
+        _json_parser = simdjson.Parser()
+        document = _json_parser.parse(raw)
+    return select(document)
+
+
+def raise_for_status(response: httpx.Response) -> None:
+    """Raise the SDK's ClientError or ServerError for an error response, as the SDK does."""
+    status_code = response.status_code
+    if status_code < 400:
+        return
+    if status_code < 500:
+        try:
+            err = orjson.loads(response.content)
+        except orjson.JSONDecodeError:
+            err = None
+        if not isinstance(err, dict):
+            raise ClientError(status_code, None, response.text, None, response.headers)
+        raise ClientError(status_code, err.get("code"), err.get("msg"), response.headers, err.get("data"))
+    raise ServerError(status_code, response.text)
+
+
+async def info_request(payload: Dict[str, Any]) -> bytes:
+    """POST a query to the /info endpoint over the shared async client and return the raw response body."""
+    response = await http_client.post("/info", content=orjson.dumps(payload))
+    raise_for_status(response)
+    return response.content
+
+
+async def info_post_raw(payload: Dict[str, Any]) -> str:
+    """
+    POST a query to the /info endpoint and return the response body itself as JSON text.
+
+    Tools that pass the upstream payload through unchanged return this text as-is, with
+    no decoding or re-encoding. The body is still checked to be well-formed JSON, which
+    simdjson does without building any Python objects.
+    """
+    raw = await info_request(payload)
+    try:
+        select_json(raw, lambda document: None)
+    except ValueError:
+        # Report the upstream body, as the SDK does, rather than simdjson's error
+        raise ValueError(f"Could not parse JSON: {raw.decode(errors='replace')}") from None
+    return raw.decode()
+
+def iso_to_ms(value: str) -> int:
+    """
+    Convert an ISO 8601 time string to epoch milliseconds.
+
+    The documented YYYY-MM-DDTHH:MM:SSZ form is sliced directly; any other form is
+    handed to iso8601, which treats strings without an offset as UTC. The fast path
+    only takes strings that iso8601 would parse the same way (ASCII digits, uppercase
+    T and Z), so both paths accept and reject the same inputs.
+    """
+    if (
+        len(value) == 20 and value[19] == "Z" and value[10] == "T"
+        and value[4] == value[7] == "-" and value[13] == value[16] == ":"
+        and value.isascii()
+        and value[0:4].isdigit() and value[5:7].isdigit() and value[8:10].isdigit()
+        and value[11:13].isdigit() and value[14:16].isdigit() and value[17:19].isdigit()
+    ):
+        try:
+            moment = datetime(
+                int(value[0:4]), int(value[5:7]), int(value[8:10]),
+                int(value[11:13]), int(value[14:16]), int(value[17:19]),
+                tzinfo=timezone.utc,
+            )
+            return int(moment.timestamp()) * 1000
+        except ValueError:
+            pass  # Out-of-range fields; let iso8601 report the error
+    return int(iso8601.parse_date(value).timestamp() * 1000)
+
+# Market metadata changes on the order of hours, so it is served from an in-process
+# TTL cache holding the JSON text. Asset contexts (mark prices, funding,
+# open interest) move constantly and only get a short TTL.
+META_TTL = 300.0
+ASSET_CTXS_TTL = 5.0
+ALL_MIDS_TTL = 60.0
+
+
+_cache: Dict[Tuple, Tuple[float, str]] = {}
+_inflight: Dict[Tuple, asyncio.Future] = {}
+
+
+async def single_flight(key: Tuple, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Await fetch(), sharing a single in-flight call among concurrent callers with the same key.
+
+    Identical requests from concurrent clients then cost one upstream call, which also
+    keeps them clear of the API rate limits. The shared call is shielded, so a caller
+    that is cancelled does not cancel it for the others.
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(fetch())
+        _inflight[key] = task
+        task.add_done_callback(lambda done: _inflight.pop(key) if _inflight.get(key) is done else None)
+    return await asyncio.shield(task)
+
+
+async def shared_dumps(key: Tuple, fetch: Callable[[], Awaitable[Any]]) -> str:
+    """Return the serialized result of awaiting fetch(), coalescing identical concurrent calls."""
+    async def fetch_and_dump() -> str:
+        return as_json(await fetch())
+
+    return await single_flight(key, fetch_and_dump)
+
+
+async def cached_dumps(key: Tuple, ttl: float, fetch: Callable[[], Awaitable[Any]]) -> str:
+    """
+    Return the serialized result of awaiting fetch(), reusing it for ttl seconds.
+
+    Concurrent misses on the same key share a single refresh. Failures are not cached.
+    """
+    entry = _cache.get(key)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+
+    async def refresh() -> str:
+        payload = as_json(await fetch())
+        _cache[key] = (time.monotonic() + ttl, payload)
+        return payload
+
+    return await single_flight(key, refresh)
+
+
+async def keep_cache_warm(key: Tuple, interval: float, fetch: Callable[[], Awaitable[Any]]) -> None:
+    """
+    Refetch a cache entry every interval seconds so that handlers are served from memory.
+
+    Each refresh is valid for two intervals; if refreshing keeps failing the entry
+    expires and handlers fall back to fetching on demand.
+    """
+    while True:
+        try:
+            _cache[key] = (time.monotonic() + 2 * interval, as_json(await fetch()))
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to refresh cached {key}: {e}")
+        await asyncio.sleep(interval)
+
+
+# The SDK's Info client is only used for its coin name table. Constructed without
+# metadata it fetches spotMeta and meta with blocking calls, so both are fetched here
+# instead, on first use rather than at import (which would delay every worker's startup).
+_info: Optional[Info] = None
+
+
+async def build_info() -> Info:
+    spot_meta, meta = await asyncio.gather(info_request({"type": "spotMeta"}), info_request({"type": "meta"}))
+    # Given both, Info does no I/O of its own
+    return Info(constants.MAINNET_API_URL, skip_ws=True, meta=orjson.loads(meta), spot_meta=orjson.loads(spot_meta))
+
+
+async def get_info() -> Info:
+    """Return the shared mainnet Info client, building it on first use."""
+    global _info
+    if _info is None:
+        _info = await single_flight(("info",), build_info)
+    return _info
+
+
+async def name_to_coin(coin_name: str) -> str:
+    """Resolve a coin or spot pair name (e.g. 'BTC', 'PURR/USDC') to the coin the API expects."""
+    return (await get_info()).name_to_coin[coin_name]
+
+
+async def preload_info() -> None:
+    """Build the Info client in the background, so that the first coin lookup does not wait for it."""
+    try:
+        await get_info()
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to preload coin metadata, retrying on first use: {e}")
+
+
+async def fetch_all_mids() -> str:
+    return await info_post_raw({"type": "allMids"})
+
+
+async def fetch_perp_metadata(include_asset_ctxs: bool) -> str:
+    return await info_post_raw({"type": "metaAndAssetCtxs" if include_asset_ctxs else "meta"})
 
 # Create MCP server with host configuration
-import os
 host = os.getenv("HOST", "0.0.0.0")
 port = int(os.getenv("PORT", 8001))
+workers = int(os.getenv("WORKERS", 1))
+
+# When running over HTTP, the hottest entries are kept warm by background tasks. Every
+# worker process runs its own, so the default intervals grow with the worker count to
+# keep the total upstream load at that of one process: about 360 of the API's 1200
+# request weight per minute per IP (allMids weighs 2, metaAndAssetCtxs 20). An interval
+# of 0 turns that refresher off.
+ALL_MIDS_REFRESH_INTERVAL = float(os.getenv("ALL_MIDS_REFRESH_INTERVAL", 1.0 * workers))
+ASSET_CTXS_REFRESH_INTERVAL = float(os.getenv("ASSET_CTXS_REFRESH_INTERVAL", 5.0 * workers))
+json_response = os.getenv("JSON_RESPONSE", "false").lower() == "true"
 
 logger.info(f"🚀 Starting MCP server configuration:")
 logger.info(f"🚀 Host: {host}")
 logger.info(f"🚀 Port: {port}")
+logger.info(f"🚀 Workers: {workers}")
+logger.info(f"🚀 Refresh intervals: all mids {ALL_MIDS_REFRESH_INTERVAL}s, asset contexts {ASSET_CTXS_REFRESH_INTERVAL}s")
+logger.info(f"🚀 JSON responses: {json_response}")
 logger.info(f"🚀 Environment PORT: {os.getenv('PORT', 'Not set')}")
 logger.info(f"🚀 Environment HOST: {os.getenv('HOST', 'Not set')}")
 
 mcp = FastMCP(
     name="Hyperliquid Info",
-    dependencies=["hyperliquid-python-sdk", "pillow", "python-iso8601"],
+    dependencies=["hyperliquid-python-sdk", "pillow", "python-iso8601", "orjson", "httpx[http2]", "pysimdjson"],
     host=host,
-    port=port
+    port=port,
+    # Sessions live in a worker's memory, so with several workers every request must stand alone
+    stateless_http=workers > 1,
+    # Plain JSON responses instead of SSE streams, so that they can be gzip-compressed
+    json_response=json_response,
     # Don't specify streamable_http_path - let it use defaults
 )
 
-# Note: FastMCP doesn't easily expose the underlying app for middleware
-# But we have comprehensive logging built into the tools and server startup
 logger.info("🔧 FastMCP server configured with comprehensive logging")
-logger.info("🔧 Middleware would need to be added differently - using tool-level logging instead")
+
+
+@asynccontextmanager
+async def server_lifespan() -> AsyncIterator[None]:
+    """Own process-wide resources for the lifetime of the HTTP server."""
+    background = [asyncio.create_task(preload_info())]
+    if ALL_MIDS_REFRESH_INTERVAL > 0:
+        background.append(asyncio.create_task(
+            keep_cache_warm(("all_mids",), ALL_MIDS_REFRESH_INTERVAL, fetch_all_mids)
+        ))
+    if ASSET_CTXS_REFRESH_INTERVAL > 0:
+        background.append(asyncio.create_task(keep_cache_warm(
+            ("perp_meta", True), ASSET_CTXS_REFRESH_INTERVAL, lambda: fetch_perp_metadata(True)
+        )))
+    try:
+        yield
+    finally:
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+        await http_client.aclose()
+
+
+def create_app():
+    """
+    Build the Streamable HTTP ASGI app with the server lifespan around FastMCP's own.
+
+    FastMCP's lifespan hook runs once per MCP session, so resources shared by all
+    sessions (like the HTTP client) are attached to the Starlette app lifespan instead.
+
+    Responses of 1 KB or more are gzip-compressed for clients that accept it. Starlette
+    never compresses text/event-stream, so this only applies with JSON_RESPONSE set.
+    """
+    app = mcp.streamable_http_app()
+    session_manager_lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan(app) -> AsyncIterator[None]:
+        async with server_lifespan(), session_manager_lifespan(app):
+            yield
+
+    app.router.lifespan_context = lifespan
+    app.add_middleware(GZipMiddleware, minimum_size=1024)
+    return app
 
 # Tool: Get user state
 @mcp.tool()
-async def get_user_state(account_address: str, check_spot: bool=False, ctx: Context=None) -> str:
+@tool_json("Failed to fetch user state")
+async def get_user_state(account_address: str, check_spot: bool=False, ctx: Context=None) -> Any:
     """
     Query user state including trading positions, margin, and withdrawable balance.
 
@@ -67,15 +403,12 @@ async def get_user_state(account_address: str, check_spot: bool=False, ctx: Cont
             current_price, unrealized_pnl), margin_summary, and withdrawable balance. Returns a JSON string with an
             error message if the query fails.
     """
-    try:
-        user_state = info.spot_user_state(account_address) if check_spot else info.user_state(account_address)
-        return json.dumps(user_state)
-    except Exception as e:
-        return json.dumps({"error": f"Failed to fetch user state: {str(e)}"})
+    return await info_post_raw({"type": "spotClearinghouseState" if check_spot else "clearinghouseState", "user": account_address})
 
 # Tool: Get user open orders
 @mcp.tool()
-async def get_user_open_orders(account_address: str, ctx: Context) -> str:
+@tool_json("Failed to fetch user open orders")
+async def get_user_open_orders(account_address: str, ctx: Context) -> Any:
     """
     Fetch all open orders for a specific user account.
 
@@ -87,15 +420,12 @@ async def get_user_open_orders(account_address: str, ctx: Context) -> str:
         str: A JSON string containing a list of open orders, each with details such as order ID, symbol, size, price,
             and status. Returns a JSON string with an error message if the query fails.
     """
-    try:
-        open_orders = info.open_orders(account_address)
-        return json.dumps(open_orders)
-    except Exception as e:
-        return json.dumps({"error": f"Failed to fetch user open orders: {str(e)}"})
+    return await info_post_raw({"type": "openOrders", "user": account_address})
 
 # Tool: Get all mids
 @mcp.tool()
-async def get_all_mids(ctx: Context) -> str:
+@tool_json("Failed to fetch all mids")
+async def get_all_mids(ctx: Context) -> Any:
     """
     Retrieve the mid prices for all trading pairs available on the exchange.
 
@@ -106,15 +436,12 @@ async def get_all_mids(ctx: Context) -> str:
         str: A JSON string containing a dictionary of trading pairs and their mid prices.
             Returns a JSON string with an error message if the query fails.
     """
-    try:
-        all_mids = info.all_mids()
-        return json.dumps(all_mids)
-    except Exception as e:
-        return json.dumps({"error": f"Failed to fetch all mids: {str(e)}"})
+    return await cached_dumps(("all_mids",), ALL_MIDS_TTL, fetch_all_mids)
 
 # Tool: Get user trade history
 @mcp.tool()
-async def get_user_trade_history(account_address: str, ctx: Context) -> str:
+@tool_json("Failed to fetch user fills")
+async def get_user_trade_history(account_address: str, ctx: Context) -> Any:
     """
     Fetch the trade fill history for a specific user account.
 
@@ -126,15 +453,12 @@ async def get_user_trade_history(account_address: str, ctx: Context) -> str:
         str: A JSON string containing a list of trade fills, each with details such as symbol, size, price, timestamp,
             and trade ID. Returns a JSON string with an error message if the query fails.
     """
-    try:
-        fills = info.user_fills(account_address)
-        return json.dumps(fills)
-    except Exception as e:
-        return json.dumps({"error": f"Failed to fetch user fills: {str(e)}"})
+    return await info_post_raw({"type": "userFills", "user": account_address})
 
 # Tool: Get perpetual DEXs
 @mcp.tool()
-async def get_perp_dexs(ctx: Context) -> str:
+@tool_json("Failed to fetch perpetual DEXs")
+async def get_perp_dexs(ctx: Context) -> Any:
     """
     Retrieve metadata about perpetual markets available on the Hyperliquid decentralized exchange.
 
@@ -146,15 +470,13 @@ async def get_perp_dexs(ctx: Context) -> str:
             contract details (e.g., symbol, tick size, contract type). Returns a JSON string with an error message if
             the query fails.
     """
-    try:
-        data = info.meta()  # Use meta() as perp_dexs is not a valid SDK method
-        return json.dumps(data)
-    except Exception as e:
-        return json.dumps({"error": f"Failed to fetch perpetual DEXs: {str(e)}"})
+    # There is no separate perp DEX listing query; the perp meta lists the markets
+    return await cached_dumps(("perp_meta", False), META_TTL, lambda: fetch_perp_metadata(False))
 
 # Tool: Get coin funding history
 @mcp.tool()
-async def get_coin_funding_history(coin_name: str, start_time: str, end_time: str, ctx: Context) -> str:
+@tool_json("Failed to fetch coin funding history")
+async def get_coin_funding_history(coin_name: str, start_time: str, end_time: str, ctx: Context) -> Any:
     """
     Fetch the funding rate history for a specific coin.
 
@@ -168,17 +490,18 @@ async def get_coin_funding_history(coin_name: str, start_time: str, end_time: st
         str: A JSON string containing a list of funding rate records, each with details such as funding rate and timestamp.
             Returns a JSON string with an error message if the query fails.
     """
-    try:
-        start_ms = int(iso8601.parse_date(start_time).timestamp() * 1000)
-        end_ms = int(iso8601.parse_date(end_time).timestamp() * 1000)
-        data = info.funding_history(coin_name, start_ms, end_ms)
-        return json.dumps(data)
-    except Exception as e:
-        return json.dumps({"error": f"Failed to fetch coin funding history: {str(e)}"})
+    start_ms = iso_to_ms(start_time)
+    end_ms = iso_to_ms(end_time)
+    coin = await name_to_coin(coin_name)
+    return await shared_dumps(
+        ("fundingHistory", coin, start_ms, end_ms),
+        lambda: info_post_raw({"type": "fundingHistory", "coin": coin, "startTime": start_ms, "endTime": end_ms}),
+    )
 
 # Tool: Get user funding history
 @mcp.tool()
-async def get_user_funding_history(account_address: str, start_time: str, end_time: str, ctx: Context) -> str:
+@tool_json("Failed to fetch user funding history")
+async def get_user_funding_history(account_address: str, start_time: str, end_time: str, ctx: Context) -> Any:
     """
     Fetch the funding payment history for a specific user account.
 
@@ -192,37 +515,49 @@ async def get_user_funding_history(account_address: str, start_time: str, end_ti
         str: A JSON string containing a list of funding payment records, each with details such as amount and timestamp.
             Returns a JSON string with an error message if the query fails.
     """
-    try:
-        start_ms = int(iso8601.parse_date(start_time).timestamp() * 1000)
-        end_ms = int(iso8601.parse_date(end_time).timestamp() * 1000)
-        data = info.user_funding_history(account_address, start_ms, end_ms)
-        return json.dumps(data)
-    except Exception as e:
-        return json.dumps({"error": f"Failed to fetch user funding history: {str(e)}"})
+    start_ms = iso_to_ms(start_time)
+    end_ms = iso_to_ms(end_time)
+    return await info_post_raw({"type": "userFunding", "user": account_address, "startTime": start_ms, "endTime": end_ms})
 
 # Tool: Get L2 snapshot
 @mcp.tool()
-async def get_l2_snapshot(coin_name: str, ctx: Context) -> str:
+@tool_json("Failed to fetch L2 snapshot")
+async def get_l2_snapshot(coin_name: str, depth: int=20, ctx: Context=None) -> Any:
     """
     Fetch the Level 2 order book snapshot for a specific coin.
 
     Parameters:
         coin_name (str): The trading symbol (e.g., 'BTC', 'ETH').
-        ctx (Context): The MCP context object for accessing server state.
+        depth (int, optional): The number of price levels to return on each side of the book. 0 returns every level.
+            Defaults to 20.
+        ctx (Context, optional): The MCP context object for accessing server state.
 
     Returns:
         str: A JSON string containing the Level 2 order book snapshot, including bids and asks with prices and sizes.
             Returns a JSON string with an error message if the query fails.
     """
-    try:
-        data = info.l2_snapshot(coin_name)
-        return json.dumps(data)
-    except Exception as e:
-        return json.dumps({"error": f"Failed to fetch L2 snapshot: {str(e)}"})
+    payload = {"type": "l2Book", "coin": await name_to_coin(coin_name)}
+    if depth <= 0:
+        return await shared_dumps(("l2Book", payload["coin"], 0), lambda: info_post_raw(payload))
+
+    def select(book: Any) -> Optional[Dict[str, Any]]:
+        levels = book["levels"]
+        if all(len(side) <= depth for side in levels):
+            return None
+        return {"coin": book["coin"], "time": book["time"], "levels": [side[:depth] for side in levels]}
+
+    async def fetch() -> Any:
+        raw = await info_request(payload)
+        book = select_json(raw, select)
+        # A book that is already within depth is passed through as received
+        return raw.decode() if book is None else book
+
+    return await shared_dumps(("l2Book", payload["coin"], depth), fetch)
 
 # Tool: Get candles snapshot
 @mcp.tool()
-async def get_candles_snapshot(coin_name: str, interval: str, start_time: str, end_time: str, ctx: Context) -> str:
+@tool_json("Failed to fetch candles snapshot")
+async def get_candles_snapshot(coin_name: str, interval: str, start_time: str, end_time: str, ctx: Context) -> Any:
     """
     Fetch the candlestick data snapshot for a specific coin.
 
@@ -237,17 +572,20 @@ async def get_candles_snapshot(coin_name: str, interval: str, start_time: str, e
         str: A JSON string containing a list of candlestick data, each with open, high, low, close, volume, and timestamp.
             Returns a JSON string with an error message if the query fails.
     """
-    try:
-        start_ms = int(iso8601.parse_date(start_time).timestamp() * 1000)
-        end_ms = int(iso8601.parse_date(end_time).timestamp() * 1000)
-        data = info.candles_snapshot(coin_name, interval, start_ms, end_ms)
-        return json.dumps(data)
-    except Exception as e:
-        return json.dumps({"error": f"Failed to fetch candles snapshot: {str(e)}"})
+    start_ms = iso_to_ms(start_time)
+    end_ms = iso_to_ms(end_time)
+    coin = await name_to_coin(coin_name)
+    return await shared_dumps(
+        ("candleSnapshot", coin, interval, start_ms, end_ms),
+        lambda: info_post_raw({"type": "candleSnapshot", "req": {
+            "coin": coin, "interval": interval, "startTime": start_ms, "endTime": end_ms,
+        }}),
+    )
 
 # Tool: Get user fees
 @mcp.tool()
-async def get_user_fees(account_address: str, ctx: Context) -> str:
+@tool_json("Failed to fetch user fees")
+async def get_user_fees(account_address: str, ctx: Context) -> Any:
     """
     Fetch the fee structure and rates for a specific user account.
 
@@ -259,15 +597,53 @@ async def get_user_fees(account_address: str, ctx: Context) -> str:
         str: A JSON string containing the user's fee structure, including maker and taker fees.
             Returns a JSON string with an error message if the query fails.
     """
-    try:
-        data = info.user_fees(account_address)
-        return json.dumps(data)
-    except Exception as e:
-        return json.dumps({"error": f"Failed to fetch user fees: {str(e)}"})
+    return await info_post_raw({"type": "userFees", "user": account_address})
+
+# Tool: Get user bundle
+@mcp.tool()
+@tool_json("Failed to fetch user bundle")
+async def get_user_bundle(account_address: str, start_time: str, end_time: str, ctx: Context) -> Any:
+    """
+    Fetch user state, open orders, trade history, funding history and fees for an account in one call.
+
+    The five queries are issued concurrently, so the call takes about as long as the slowest of them.
+
+    Parameters:
+        account_address (str): The Hyperliquid account address (e.g., '0xcd5051944f780a621ee62e39e493c489668acf4d').
+        start_time (str): The start time for the funding history in ISO 8601 format (e.g., '2025-01-01T00:00:00Z').
+        end_time (str): The end time for the funding history in ISO 8601 format (e.g., '2025-12-31T23:59:59Z').
+        ctx (Context): The MCP context object for accessing server state.
+
+    Returns:
+        str: A JSON string with the keys user_state, open_orders, trade_history, funding_history and fees. A section
+            that fails holds a JSON object with an error message instead; if the request itself is invalid, a JSON
+            string with an error message is returned.
+    """
+    start_ms = iso_to_ms(start_time)
+    end_ms = iso_to_ms(end_time)
+
+    sections = {
+        "user_state": ("user state", {"type": "clearinghouseState", "user": account_address}),
+        "open_orders": ("user open orders", {"type": "openOrders", "user": account_address}),
+        "trade_history": ("user fills", {"type": "userFills", "user": account_address}),
+        "funding_history": ("user funding history", {
+            "type": "userFunding", "user": account_address, "startTime": start_ms, "endTime": end_ms,
+        }),
+        "fees": ("user fees", {"type": "userFees", "user": account_address}),
+    }
+    results = await asyncio.gather(*(info_post_raw(payload) for _, payload in sections.values()), return_exceptions=True)
+    # The sections are spliced into the bundle as received rather than decoded and re-encoded
+    parts = []
+    for (key, (label, _)), result in zip(sections.items(), results):
+        if isinstance(result, Exception):
+            result = '{"error":"' + json_escape(f"Failed to fetch {label}: {result}") + '"}'
+        parts.append(f'"{key}":{result}')
+    return "{" + ",".join(parts) + "}"
 
 # Tool: Get user staking summary
 @mcp.tool()
-async def get_user_staking_summary(account_address: str, ctx: Context) -> str:
+@tool_json("Failed to fetch user staking summary")
+async def get_user_staking_summary(account_address: str, ctx: Context) -> Any:
     """
     Fetch the staking summary for a specific user account.
 
@@ -279,15 +655,12 @@ async def get_user_staking_summary(account_address: str, ctx: Context) -> str:
         str: A JSON string containing the staking summary, including staked amounts and status.
             Returns a JSON string with an error message if the query fails.
     """
-    try:
-        data = info.user_staking_summary(account_address)
-        return json.dumps(data)
-    except Exception as e:
-        return json.dumps({"error": f"Failed to fetch user staking summary: {str(e)}"})
+    return await info_post_raw({"type": "delegatorSummary", "user": account_address})
 
 # Tool: Get user staking rewards
 @mcp.tool()
-async def get_user_staking_rewards(account_address: str, ctx: Context) -> str:
+@tool_json("Failed to fetch user staking rewards")
+async def get_user_staking_rewards(account_address: str, ctx: Context) -> Any:
     """
     Fetch the staking rewards history for a specific user account.
 
@@ -299,15 +672,12 @@ async def get_user_staking_rewards(account_address: str, ctx: Context) -> str:
         str: A JSON string containing a list of staking reward records, each with amount and timestamp.
             Returns a JSON string with an error message if the query fails.
     """
-    try:
-        data = info.user_staking_rewards(account_address)
-        return json.dumps(data)
-    except Exception as e:
-        return json.dumps({"error": f"Failed to fetch user staking rewards: {str(e)}"})
+    return await info_post_raw({"type": "delegatorRewards", "user": account_address})
 
 # Tool: Get user order by OID
 @mcp.tool()
-async def get_user_order_by_oid(account_address: str, oid: int, ctx: Context) -> str:
+@tool_json("Failed to fetch user order by oid")
+async def get_user_order_by_oid(account_address: str, oid: int, ctx: Context) -> Any:
     """
     Fetch details of a specific order by its order ID for a user account.
 
@@ -320,36 +690,30 @@ async def get_user_order_by_oid(account_address: str, oid: int, ctx: Context) ->
         str: A JSON string containing the order details, including symbol, size, price, and status.
             Returns a JSON string with an error message if the query fails.
     """
-    try:
-        data = info.query_order_by_oid(account_address, oid)
-        return json.dumps(data)
-    except Exception as e:
-        return json.dumps({"error": f"Failed to fetch user order by oid: {str(e)}"})
+    return await info_post_raw({"type": "orderStatus", "user": account_address, "oid": oid})
 
 # Tool: Get user order by CLOID
 @mcp.tool()
-async def get_user_order_by_cloid(account_address: str, cloid: str, ctx: Context) -> str:
+@tool_json("Failed to fetch user order by cloid")
+async def get_user_order_by_cloid(account_address: str, cloid: str, ctx: Context) -> Any:
     """
     Fetch details of a specific order by its client order ID for a user account.
 
     Parameters:
         account_address (str): The Hyperliquid account address (e.g., '0xcd5051944f780a621ee62e39e493c489668acf4d').
-        cloid (str): The client order ID to query.
+        cloid (str): The client order ID to query, as a 128-bit hex string (e.g., '0x00000000000000000000000000000001').
         ctx (Context): The MCP context object for accessing server state.
 
     Returns:
         str: A JSON string containing the order details, including symbol, size, price, and status.
             Returns a JSON string with an error message if the query fails.
     """
-    try:
-        data = info.query_order_by_cloid(account_address, cloid)
-        return json.dumps(data)
-    except Exception as e:
-        return json.dumps({"error": f"Failed to fetch user order by cloid: {str(e)}"})
+    return await info_post_raw({"type": "orderStatus", "user": account_address, "oid": cloid})
 
 # Tool: Get user sub-accounts
 @mcp.tool()
-async def get_user_sub_accounts(account_address: str, ctx: Context) -> str:
+@tool_json("Failed to fetch user sub accounts")
+async def get_user_sub_accounts(account_address: str, ctx: Context) -> Any:
     """
     Fetch the sub-accounts associated with a specific user account.
 
@@ -361,15 +725,12 @@ async def get_user_sub_accounts(account_address: str, ctx: Context) -> str:
         str: A JSON string containing a list of sub-accounts and their details.
             Returns a JSON string with an error message if the query fails.
     """
-    try:
-        data = info.query_sub_accounts(account_address)
-        return json.dumps(data)
-    except Exception as e:
-        return json.dumps({"error": f"Failed to fetch user sub accounts: {str(e)}"})
+    return await info_post_raw({"type": "subAccounts", "user": account_address})
 
 # Tool: Get perpetual metadata
 @mcp.tool()
-async def get_perp_metadata(include_asset_ctxs: bool=False, ctx: Context=None) -> str:
+@tool_json("Failed to fetch perpetual metadata")
+async def get_perp_metadata(include_asset_ctxs: bool=False, ctx: Context=None) -> Any:
     """
     Fetch metadata about perpetual markets on the Hyperliquid exchange.
 
@@ -381,15 +742,15 @@ async def get_perp_metadata(include_asset_ctxs: bool=False, ctx: Context=None) -
         str: A JSON string containing metadata about perpetual markets, including trading pairs and contract details
             (e.g., symbol, tick size). Returns a JSON string with an error message if the query fails.
     """
-    try:
-        data = info.meta_and_asset_ctxs() if include_asset_ctxs else info.meta()
-        return json.dumps(data)
-    except Exception as e:
-        return json.dumps({"error": f"Failed to fetch perpetual metadata: {str(e)}"})
+    ttl = ASSET_CTXS_TTL if include_asset_ctxs else META_TTL
+    return await cached_dumps(
+        ("perp_meta", include_asset_ctxs), ttl, lambda: fetch_perp_metadata(include_asset_ctxs)
+    )
 
 # Tool: Get spot metadata
 @mcp.tool()
-async def get_spot_metadata(include_asset_ctxs: bool=False, ctx: Context=None) -> str:
+@tool_json("Failed to fetch spot metadata")
+async def get_spot_metadata(include_asset_ctxs: bool=False, ctx: Context=None) -> Any:
     """
     Fetch metadata about spot markets on the Hyperliquid exchange.
 
@@ -401,14 +762,24 @@ async def get_spot_metadata(include_asset_ctxs: bool=False, ctx: Context=None) -
         str: A JSON string containing metadata about spot markets, including trading pairs and contract details
             (e.g., symbol, tick size). Returns a JSON string with an error message if the query fails.
     """
-    try:
-        data = info.spot_meta_and_asset_ctxs() if include_asset_ctxs else info.spot_meta()
-        return json.dumps(data)
-    except Exception as e:
-        return json.dumps({"error": f"Failed to fetch spot metadata: {str(e)}"})
+    payload = {"type": "spotMetaAndAssetCtxs" if include_asset_ctxs else "spotMeta"}
+    ttl = ASSET_CTXS_TTL if include_asset_ctxs else META_TTL
+    return await cached_dumps(("spot_meta", include_asset_ctxs), ttl, lambda: info_post_raw(payload))
+
+# health_check is polled by load balancers, so everything but the timestamp is serialized once
+_HC_PREFIX = '{"status":"healthy","timestamp":"'
+_HC_SUFFIX = '",' + dumps({
+    "server": "Hyperliquid Info MCP",
+    "version": "1.0.0",
+    "host": host,
+    "port": port,
+    "transport": "streamable-http",
+    "mount_path": "/mcp"
+})[1:]
 
 # Health check tool for monitoring
 @mcp.tool()
+@text_result
 async def health_check(ctx: Context) -> str:
     """
     Simple health check endpoint to verify the server is running.
@@ -419,25 +790,14 @@ async def health_check(ctx: Context) -> str:
     Returns:
         str: JSON string with server status and timestamp.
     """
-    import json
-    from datetime import datetime
-
     logger.info("💚 Health check called")
-    health_data = {
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "server": "Hyperliquid Info MCP",
-        "version": "1.0.0",
-        "host": host,
-        "port": port,
-        "transport": "streamable-http",
-        "mount_path": "/mcp"
-    }
+    health_data = _HC_PREFIX + datetime.now().isoformat() + _HC_SUFFIX
     logger.info(f"💚 Health check response: {health_data}")
-    return json.dumps(health_data)
+    return health_data
 
 # Debug endpoint for troubleshooting
 @mcp.tool()
+@text_result
 async def debug_info(ctx: Context) -> str:
     """
     Debug endpoint that returns detailed server and environment information.
@@ -448,10 +808,6 @@ async def debug_info(ctx: Context) -> str:
     Returns:
         str: JSON string with debug information.
     """
-    import json
-    import platform
-    from datetime import datetime
-
     logger.info("🐛 Debug info called")
     debug_data = {
         "server_info": {
@@ -476,7 +832,7 @@ async def debug_info(ctx: Context) -> str:
         }
     }
     logger.info(f"🐛 Debug info response: {debug_data}")
-    return json.dumps(debug_data, indent=2)
+    return dumps(debug_data, indent=True)
 
 # Prompt: Analyze user positions
 @mcp.prompt()
@@ -493,7 +849,7 @@ def analyze_positions(account_address: str) -> List[base.Message]:
     """
     return [
         base.UserMessage(f"Please analyze the trading positions for account {account_address}:"),
-        base.UserMessage("Use the get_user_state, get_user_open_orders, get_user_trade_history, get_user_funding_history, and get_user_fees tools to fetch data."),
+        base.UserMessage("Use the get_user_bundle tool to fetch the user state, open orders, trade history, funding history, and fees in a single call."),
         base.AssistantMessage(
             "I'll analyze the user's trading positions, open orders, trade history, funding payments, and fees to provide insights on risk and performance."
         )
@@ -516,7 +872,26 @@ if __name__ == "__main__":
     logger.info("🌟 ===============================================")
 
     try:
-        mcp.run(transport="streamable-http")
+        import uvicorn
+
+        # uvloop and httptools are C-accelerated; uvloop is not available on Windows
+        loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+        http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+        logger.info(f"🌟 Event loop: {loop}, HTTP parser: {http}, workers: {workers}")
+
+        uvicorn_options = dict(
+            host=host,
+            port=port,
+            loop=loop,
+            http=http,
+            log_level=mcp.settings.log_level.lower(),
+            access_log=False,  # MCP clients are chatty
+        )
+        if workers > 1:
+            # Each worker process imports this module and builds its own app
+            uvicorn.run("main:create_app", factory=True, workers=workers, **uvicorn_options)
+        else:
+            uvicorn.run(create_app(), **uvicorn_options)
     except Exception as e:
         logger.error(f"🔴 FATAL ERROR: Failed to start server: {e}")
         logger.error(f"🔴 Exception type: {type(e).__name__}")